@@ -0,0 +1,93 @@
+# app/batch.py
+
+"""
+Length-bucketed batch runner for many briefs.
+
+Briefs are sorted by length and split into short / medium / long tertiles.
+Each bucket runs as its own asyncio cohort with its own pipeline limit, and
+the cohorts run side by side, so short briefs never wait for a free pipeline
+slot behind long ones.
+
+The buckets do not get separate LLM capacity: every pipeline's calls still
+queue, first come first served, at the single OPENAI_MAX_CONCURRENCY gate in
+app/llm.py. When that gate is saturated a short brief's calls can wait behind
+a long brief's, so bucketing bounds how many long pipelines are in flight
+but does not guarantee short-brief latency.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Set, Union
+
+from app.llm import aclose_llm, env_setting
+from app.pipeline import arun_pipeline
+
+# BATCH_MAX_PIPELINES sets the concurrent pipelines allowed in the short
+# bucket; medium gets half and long a quarter, since each long brief holds
+# its slot for longer.
+DEFAULT_MAX_PIPELINES = 8
+
+BUCKET_SHARES = (1, 2, 4)  # divisors of the limit for short / medium / long
+
+
+def bucket_by_length(briefs: List[str], buckets: int = 3) -> List[List[int]]:
+    """Split brief indices into `buckets` rank tertiles (quantiles) by length."""
+    order = sorted(range(len(briefs)), key=lambda i: len(briefs[i]))
+    size, extra = divmod(len(order), buckets)
+    bins, start = [], 0
+    for b in range(buckets):
+        end = start + size + (1 if b < extra else 0)
+        bins.append(order[start:end])
+        start = end
+    return bins
+
+
+def run_batch(
+    briefs: List[str],
+    output_dir: str = "data/output",
+    dry_run: bool = False,
+    skip_stages: Set[str] | None = None,
+    parallel_outline: bool = False,
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Run many briefs, bucketed by length. Each brief writes to
+    output_dir/brief_<n> (1-based, input order); results keep input order.
+
+    A brief that fails (e.g. a reply fails its stage's validation) doesn't
+    stop the others: its slot in the results holds the exception instead,
+    and nothing is written for it.
+    """
+    max_pipelines = int(env_setting("BATCH_MAX_PIPELINES", str(DEFAULT_MAX_PIPELINES)))
+    results: List[Union[Dict[str, Any], Exception, None]] = [None] * len(briefs)
+
+    async def _run_bucket(indices: List[int], limit: int) -> None:
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _run_one(i: int) -> None:
+            async with semaphore:
+                try:
+                    results[i] = await arun_pipeline(
+                        briefs[i],
+                        output_dir=Path(output_dir) / f"brief_{i + 1}",
+                        dry_run=dry_run,
+                        skip_stages=skip_stages,
+                        parallel_outline=parallel_outline,
+                    )
+                except Exception as e:
+                    print(f"Brief {i + 1} failed: {e}")
+                    results[i] = e
+
+        await asyncio.gather(*[_run_one(i) for i in indices])
+
+    async def _run_all() -> None:
+        try:
+            await asyncio.gather(*[
+                _run_bucket(indices, max(1, max_pipelines // share))
+                for indices, share in zip(bucket_by_length(briefs), BUCKET_SHARES)
+                if indices
+            ])
+        finally:
+            await aclose_llm()
+
+    asyncio.run(_run_all())
+    return results
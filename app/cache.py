@@ -0,0 +1,144 @@
+# app/cache.py
+
+"""
+Opt-in response cache for call_llm (enable with LLM_CACHE=1).
+
+Two tiers, both scoped to the same model + system prompt:
+  1. exact    — sha256 of model + system + user
+  2. semantic — cosine similarity of the user prompt's embedding; off unless
+     LLM_CACHE_SEMANTIC=1, and only for calls that opt in with a scope
+     (Stage 1, scoped by the brief's draft_mode / proof_level / page_type
+     lines). Entries only match others stored with the same scope.
+
+Entries live in a local SQLite file and expire after LLM_CACHE_TTL seconds.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_PATH = "data/cache/llm_cache.sqlite3"
+DEFAULT_TTL = 1800
+DEFAULT_SIMILARITY = 0.95
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Stay well under the embedding model's 8k-token input limit. Longer prompts
+# only use the exact tier: truncating them would make prompts that differ
+# near the end (e.g. a new draft) look identical.
+MAX_EMBED_CHARS = 24000
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _normalize(vector: List[float]) -> array:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array("f", (x / norm for x in vector))
+
+
+class ResponseCache:
+    def __init__(self, path: str, ttl: float, similarity: float, semantic: bool = False):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.similarity = similarity
+        self.semantic = semantic
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " scope TEXT NOT NULL,"
+            " embedding BLOB,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+        self._conn.commit()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl
+
+    def get_exact(self, model: str, system: str, user: str) -> Optional[str]:
+        key = _sha256(model, system, user)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, self._cutoff()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_similar(self, model: str, system: str, scope: str, embedding: List[float]) -> Optional[str]:
+        query = _normalize(embedding)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, response FROM responses"
+                " WHERE scope = ? AND embedding IS NOT NULL AND created >= ?",
+                (_sha256(model, system, scope), self._cutoff()),
+            ).fetchall()
+
+        best_score, best_response = 0.0, None
+        for blob, response in rows:
+            stored = array("f")
+            stored.frombytes(blob)
+            if len(stored) != len(query):
+                continue
+            score = sum(a * b for a, b in zip(query, stored))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        return best_response if best_score >= self.similarity else None
+
+    def put(
+        self,
+        model: str,
+        system: str,
+        user: str,
+        embedding: Optional[List[float]],
+        response: str,
+        scope: Optional[str] = None,
+    ) -> None:
+        blob = _normalize(embedding).tobytes() if embedding is not None else None
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (self._cutoff(),))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, embedding, response, created)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (_sha256(model, system, user), _sha256(model, system, scope or ""), blob, response, time.time()),
+            )
+            self._conn.commit()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes"}
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the shared cache, or None unless LLM_CACHE is switched on."""
+    global _cache
+    if not _flag("LLM_CACHE"):
+        return None
+    if _cache is None:
+        _cache = ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_PATH),
+            ttl=float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL)),
+            similarity=float(os.getenv("LLM_CACHE_SIMILARITY", DEFAULT_SIMILARITY)),
+            semantic=_flag("LLM_CACHE_SEMANTIC"),
+        )
+    return _cache
+
+
+def embeddable(user: str) -> bool:
+    return len(user) <= MAX_EMBED_CHARS
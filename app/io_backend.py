@@ -0,0 +1,185 @@
+# app/io_backend.py
+
+"""
+Bulk file writer for pipeline outputs.
+
+write_files() writes several independent files in one go:
+  - Linux + the optional `liburing` package: each file's chunks are queued
+    as-is (no joined copy) as a writev on a shared io_uring submission queue,
+    submitted with a single syscall and the completions reaped together. All
+    of a file's chunks are held until its write completes.
+  - Anywhere else (or if the ring can't be set up): ordinary buffered writes
+    overlapped on a shared thread pool, streaming each file's chunks as they
+    come.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, List, Sequence, Tuple
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+HAVE_URING = sys.platform == "linux" and liburing is not None
+
+RING_ENTRIES = 1024
+
+# Linux caps the buffers a single writev can take (UIO_MAXIOV)
+IOV_MAX = 1024
+
+# Threads in the shared pool used by the fallback writer
+WRITE_THREADS = 4
+
+# (destination, chunks of bytes making up the file)
+FileChunks = Tuple[Path, Iterable[bytes]]
+
+# One queued writev: (path, fd, file offset, the chunks it covers, their iovec)
+_Write = Tuple[Path, int, int, List[bytes], Any]
+
+_ring = None
+_ring_cqe = None
+_ring_lock = threading.Lock()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_ring():
+    global _ring, _ring_cqe
+    if _ring is None:
+        ring = liburing.Ring()
+        cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(RING_ENTRIES, ring, 0)
+        _ring, _ring_cqe = ring, cqe
+    return _ring, _ring_cqe
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    # Created once and reused, so each write_output() doesn't pay for
+    # spawning and joining its own threads
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WRITE_THREADS, thread_name_prefix="io_backend")
+    return _pool
+
+
+def _write_one(path: Path, chunks: Iterable[bytes]) -> None:
+    with open(path, "wb") as f:
+        f.writelines(chunks)
+
+
+def _write_files_posix(files: Sequence[FileChunks]) -> None:
+    if len(files) == 1:
+        _write_one(*files[0])
+        return
+
+    pool = _get_pool()
+    futures = [pool.submit(_write_one, path, chunks) for path, chunks in files]
+    for future in futures:
+        future.result()
+
+
+def _plan_writes(path: Path, fd: int, chunks: List[bytes]) -> List[_Write]:
+    # One writev per IOV_MAX chunks, at increasing offsets
+    writes, offset = [], 0
+    for start in range(0, len(chunks), IOV_MAX):
+        group = chunks[start:start + IOV_MAX]
+        writes.append((path, fd, offset, group, liburing.Iovec(group)))
+        offset += sum(map(len, group))
+    return writes
+
+
+def _finish_short_write(fd: int, offset: int, chunks: List[bytes], written: int) -> None:
+    for chunk in chunks:
+        if written >= len(chunk):
+            written -= len(chunk)
+            offset += len(chunk)
+            continue
+        view = memoryview(chunk)[written:]
+        offset += written
+        written = 0
+        while view:
+            n = os.pwrite(fd, view, offset)
+            view, offset = view[n:], offset + n
+
+
+def _submit_writes(ring, cqe, writes: List[_Write]) -> List[OSError]:
+    for i, (_, fd, offset, _, iov) in enumerate(writes):
+        sqe = liburing.io_uring_get_sqe(ring)
+        liburing.io_uring_prep_writev(sqe, fd, iov, offset)
+        liburing.io_uring_sqe_set_data64(sqe, i)
+    liburing.io_uring_submit(ring)
+
+    # Reap every completion before raising, so none are left on the ring
+    errors: List[OSError] = []
+    for _ in writes:
+        liburing.io_uring_wait_cqe(ring, cqe)
+        entry = cqe[0]
+        i, written = entry.user_data, entry.res
+        liburing.io_uring_cqe_seen(ring, entry)
+
+        path, fd, offset, chunks, _ = writes[i]
+        if written < 0:
+            errors.append(OSError(-written, os.strerror(-written), str(path)))
+        elif written < sum(map(len, chunks)):
+            # Short write: finish the tail synchronously
+            try:
+                _finish_short_write(fd, offset, chunks, written)
+            except OSError as e:
+                errors.append(e)
+    return errors
+
+
+def _write_files_uring(files: Sequence[FileChunks]) -> None:
+    fds: List[int] = []
+    errors: List[OSError] = []
+    try:
+        # Open every file and build every iovec before preparing any SQE: if
+        # one of those steps fails, nothing is left queued on the ring that a
+        # later call would submit against a closed fd or a freed buffer
+        writes: List[_Write] = []
+        for path, chunks in files:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            fds.append(fd)
+            writes.extend(_plan_writes(path, fd, [chunk for chunk in chunks if chunk]))
+
+        with _ring_lock:
+            ring, cqe = _get_ring()
+            for start in range(0, len(writes), RING_ENTRIES):
+                errors.extend(_submit_writes(ring, cqe, writes[start:start + RING_ENTRIES]))
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+    if errors:
+        raise errors[0]
+
+
+def _ring_available() -> bool:
+    # Probe under the lock so concurrent first calls create a single ring
+    global HAVE_URING
+    with _ring_lock:
+        if HAVE_URING:
+            try:
+                _get_ring()
+            except Exception as e:
+                # e.g. kernel without io_uring, or seccomp blocking it
+                print(f"io_uring unavailable ({e}); using threaded writes")
+                HAVE_URING = False
+        return HAVE_URING
+
+
+def write_files(files: Sequence[FileChunks]) -> None:
+    """Write each (path, chunks) pair, overwriting existing files."""
+    if not files:
+        return
+    if HAVE_URING and _ring_available():
+        _write_files_uring(files)
+        return
+    _write_files_posix(files)
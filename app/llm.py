@@ -1,23 +1,298 @@
+import asyncio
+import hashlib
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
+import weakref
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
 
-# Load environment variables
-load_dotenv("config/.env")
+from app.cache import EMBEDDING_MODEL, ResponseCache, embeddable, get_cache
 
-# Safety check
-if not os.getenv("OPENAI_API_KEY"):
-    raise RuntimeError("OPENAI_API_KEY not found in config/.env")
+# openai, httpx and python-dotenv are imported on first LLM use, not here:
+# dry runs and skipped stages never pay their import cost or need an API key.
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL = os.getenv("MODEL_NAME", "gpt-4.1")
+DEFAULT_MODEL = "gpt-4.1"
 
+MAX_OUTPUT_TOKENS = 16000
 
-def call_llm(system_prompt: str, user_prompt: str) -> str:
-    response = client.responses.create(
-        model=MODEL,
-        instructions=system_prompt,
-        input=user_prompt,
-        max_output_tokens=16000,
-    )
+# Non-streamed responses send nothing until generation finishes, so the read
+# timeout has to cover a full 16k-token draft.
+TIMEOUT_SECONDS = {"connect": 5.0, "read": 600.0, "write": 30.0, "pool": 30.0}
+
+# Keep-alive pool shared by every call on a client: TCP/TLS setup is paid once
+MAX_KEEPALIVE_CONNECTIONS = 20
+MAX_CONNECTIONS = 40
+
+_client: "OpenAI | None" = None
+
+# The async client's connection pool and the semaphore are bound to the event
+# loop they were first used on, so keep one of each per loop (each asyncio.run()
+# starts a fresh loop). The client and semaphore hold their loop, so entries
+# never drop on their own: whoever runs the loop awaits aclose_llm() at the end.
+_async_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[AsyncOpenAI, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load config/.env into the environment (once, on first use)."""
+    from dotenv import load_dotenv
+
+    load_dotenv("config/.env")
+
+
+@lru_cache(maxsize=None)
+def _env_file() -> Dict[str, Optional[str]]:
+    from dotenv import dotenv_values
+
+    return dotenv_values("config/.env")
+
+
+def env_setting(name: str, default: str = "") -> str:
+    """
+    Read a setting from the environment, falling back to config/.env (parsed
+    once, and only when the environment doesn't set it). Unlike load_env this
+    leaves the environment untouched, so runs that never call the LLM don't
+    load the API settings.
+    """
+    value = os.getenv(name)
+    if value is None:
+        value = _env_file().get(name)
+    return default if value is None else value
+
+
+def _model() -> str:
+    load_env()
+    return os.getenv("MODEL_NAME", DEFAULT_MODEL)
+
+
+def _client_options() -> dict:
+    import httpx
+
+    load_env()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not found in config/.env")
+
+    return {
+        "api_key": api_key,
+        # Transient 429/5xx/connection errors are retried by the SDK with jittered
+        # exponential backoff (honouring Retry-After) instead of failing the run.
+        "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "5")),
+        "timeout": httpx.Timeout(**TIMEOUT_SECONDS),
+    }
+
+
+def _pool_limits():
+    import httpx
+
+    return httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS, max_connections=MAX_CONNECTIONS)
+
+
+def _get_client() -> "OpenAI":
+    global _client
+    if _client is None:
+        options = _client_options()
+        from openai import DefaultHttpxClient, OpenAI
+
+        _client = OpenAI(**options, http_client=DefaultHttpxClient(limits=_pool_limits()))
+    return _client
+
+
+def _get_async_state() -> "tuple[AsyncOpenAI, asyncio.Semaphore]":
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        options = _client_options()
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        async_client = AsyncOpenAI(**options, http_client=DefaultAsyncHttpxClient(limits=_pool_limits()))
+        # Max in-flight async requests, shared by every pipeline running on the loop
+        semaphore = asyncio.Semaphore(int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+        state = (async_client, semaphore)
+        _async_state[loop] = state
+    return state
+
+
+async def aclose_llm() -> None:
+    """Close the running loop's async client, if any; await before the loop ends."""
+    state = _async_state.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].close()
+
+
+def _prompt_cache_key(system_prompt: str) -> str:
+    # Route every call that shares a system prompt (i.e. a stage) to the same
+    # server-side prompt cache. The system prompt goes first as `instructions`
+    # and never varies, so it forms the cached prefix.
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:32]
+
+
+def _embed(text: str) -> List[float] | None:
+    if not embeddable(text):
+        return None
+    response = _get_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return response.data[0].embedding
+
+
+async def _aembed(async_client: "AsyncOpenAI", text: str) -> List[float] | None:
+    if not embeddable(text):
+        return None
+    response = await async_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return response.data[0].embedding
+
+
+def _request_kwargs(model: str, system_prompt: str, user_prompt: str) -> dict:
+    """Arguments shared by every responses.create call, streamed or not."""
+    return {
+        "model": model,
+        "instructions": system_prompt,
+        "input": user_prompt,
+        "max_output_tokens": MAX_OUTPUT_TOKENS,
+        "extra_body": {"prompt_cache_key": _prompt_cache_key(system_prompt)},
+    }
+
+
+def _cache_lookup(
+    cache: ResponseCache,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    semantic_scope: Optional[str],
+) -> tuple[str | None, List[float] | None]:
+    """Return (cached response or None, user prompt embedding for the write-back)."""
+    cached = cache.get_exact(model, system_prompt, user_prompt)
+    if cached is not None or semantic_scope is None or not cache.semantic:
+        return cached, None
+    embedding = _embed(user_prompt)
+    if embedding is not None:
+        return cache.get_similar(model, system_prompt, semantic_scope, embedding), embedding
+    return None, None
+
+
+async def _acache_lookup(
+    cache: ResponseCache,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    semantic_scope: Optional[str],
+) -> tuple[str | None, List[float] | None]:
+    """Async twin of _cache_lookup; the embeddings request counts against the semaphore."""
+    cached = cache.get_exact(model, system_prompt, user_prompt)
+    if cached is not None or semantic_scope is None or not cache.semantic:
+        return cached, None
+    async_client, semaphore = _get_async_state()
+    async with semaphore:
+        embedding = await _aembed(async_client, user_prompt)
+    if embedding is not None:
+        return cache.get_similar(model, system_prompt, semantic_scope, embedding), embedding
+    return None, None
+
+
+def _cacheable(text: str, completed: bool, validate: Optional[Callable[[str], Any]]) -> bool:
+    """
+    Only cache replies that finished and pass the caller's check (e.g. the
+    stage's schema); a truncated or malformed reply must be retried, not
+    replayed from the cache until it expires.
+    """
+    if not completed:
+        return False
+    if validate is None:
+        return True
+    try:
+        validate(text)
+    except ValueError:
+        return False
+    return True
+
+
+def call_llm(
+    system_prompt: str,
+    user_prompt: str,
+    validate: Optional[Callable[[str], Any]] = None,
+    semantic_scope: Optional[str] = None,
+) -> str:
+    """
+    validate: called on a fresh reply before it is cached; raising ValueError
+    keeps the reply out of the cache (the caller still gets it).
+    semantic_scope: also serve near-duplicate prompts from the cache (when
+    LLM_CACHE_SEMANTIC is on), but only ones stored with the same scope. Only
+    for free-text inputs (the brief), scoped by anything in them that must
+    match exactly; stage inputs built from earlier output must match exactly,
+    or a new draft could be answered with an old one's reply.
+    """
+    model = _model()
+    cache = get_cache()
+    embedding = None
+    if cache is not None:
+        cached, embedding = _cache_lookup(cache, model, system_prompt, user_prompt, semantic_scope)
+        if cached is not None:
+            return cached
+
+    response = _get_client().responses.create(**_request_kwargs(model, system_prompt, user_prompt))
+
+    if cache is not None and _cacheable(response.output_text, response.status == "completed", validate):
+        cache.put(model, system_prompt, user_prompt, embedding, response.output_text, semantic_scope)
+    return response.output_text
+
+
+def call_llm_stream(
+    system_prompt: str,
+    user_prompt: str,
+    validate: Optional[Callable[[str], Any]] = None,
+    semantic_scope: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_llm: yields text deltas as they arrive.
+    Callers that need the full response can "".join() the chunks.
+    """
+    model = _model()
+    cache = get_cache()
+    embedding = None
+    if cache is not None:
+        cached, embedding = _cache_lookup(cache, model, system_prompt, user_prompt, semantic_scope)
+        if cached is not None:
+            yield cached
+            return
+
+    stream = _get_client().responses.create(**_request_kwargs(model, system_prompt, user_prompt), stream=True)
+
+    chunks = []
+    completed = False
+    for event in stream:
+        if event.type == "response.output_text.delta":
+            chunks.append(event.delta)
+            yield event.delta
+        elif event.type == "response.completed":
+            completed = True
+
+    text = "".join(chunks)
+    if cache is not None and _cacheable(text, completed, validate):
+        cache.put(model, system_prompt, user_prompt, embedding, text, semantic_scope)
+
+
+async def acall_llm(
+    system_prompt: str,
+    user_prompt: str,
+    validate: Optional[Callable[[str], Any]] = None,
+    semantic_scope: Optional[str] = None,
+) -> str:
+    """Async variant of call_llm; concurrency is capped by OPENAI_MAX_CONCURRENCY."""
+    model = _model()
+
+    cache = get_cache()
+    embedding = None
+    if cache is not None:
+        cached, embedding = await _acache_lookup(cache, model, system_prompt, user_prompt, semantic_scope)
+        if cached is not None:
+            return cached
+
+    async_client, semaphore = _get_async_state()
+    async with semaphore:
+        response = await async_client.responses.create(**_request_kwargs(model, system_prompt, user_prompt))
+
+    if cache is not None and _cacheable(response.output_text, response.status == "completed", validate):
+        cache.put(model, system_prompt, user_prompt, embedding, response.output_text, semantic_scope)
     return response.output_text
@@ -1,9 +1,12 @@
 # app/main.py
 
 import argparse
+import asyncio
 from pathlib import Path
 
-from app.pipeline import run_pipeline
+from app.batch import run_batch
+from app.llm import aclose_llm
+from app.pipeline import arun_pipeline, run_pipeline
 
 
 DEFAULT_BRIEF = (
@@ -12,6 +15,13 @@ DEFAULT_BRIEF = (
 )
 
 
+async def _arun_pipeline(**kwargs):
+    try:
+        return await arun_pipeline(**kwargs)
+    finally:
+        await aclose_llm()
+
+
 def read_text_file(path: str) -> str:
     p = Path(path)
     if not p.exists():
@@ -22,13 +32,23 @@ def read_text_file(path: str) -> str:
 def parse_args():
     parser = argparse.ArgumentParser(description="Run the BT AI Lab content pipeline.")
     parser.add_argument("--brief", type=str, default=None, help="Brief text to run through the pipeline.")
-    parser.add_argument("--brief-file", type=str, default=None, help="Path to a text file containing the brief.")
+    parser.add_argument(
+        "--brief-file",
+        action="append",
+        default=[],
+        help="Path to a text file containing the brief. Repeat to run several briefs concurrently.",
+    )
     parser.add_argument("--out", type=str, default="data/output", help="Output directory (default: data/output).")
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Run without calling the LLM (uses placeholders).",
     )
+    parser.add_argument(
+        "--parallel-outline",
+        action="store_true",
+        help="Outline from the blueprint alone, concurrently with research (faster, no research flags in outline).",
+    )
     parser.add_argument(
         "--skip",
         action="append",
@@ -41,19 +61,48 @@ def parse_args():
 def main():
     args = parse_args()
 
+    if len(args.brief_file) > 1:
+        results = run_batch(
+            briefs=[read_text_file(path) for path in args.brief_file],
+            output_dir=args.out,
+            dry_run=args.dry_run,
+            skip_stages=set(args.skip or []),
+            parallel_outline=args.parallel_outline,
+        )
+        failed = [(path, r) for path, r in zip(args.brief_file, results) if isinstance(r, Exception)]
+        print("\nFinal output:")
+        for path, result in zip(args.brief_file, results):
+            if not isinstance(result, Exception):
+                print(f"{path}: {result}")
+        if failed:
+            print(f"\n{len(failed)} of {len(results)} briefs failed:")
+            for path, error in failed:
+                print(f"{path}: {type(error).__name__}: {error}")
+            raise SystemExit(1)
+        return
+
     if args.brief_file:
-        brief = read_text_file(args.brief_file)
+        brief = read_text_file(args.brief_file[0])
     elif args.brief:
         brief = args.brief.strip()
     else:
         brief = DEFAULT_BRIEF
 
-    result = run_pipeline(
-        brief=brief,
-        output_dir=args.out,
-        dry_run=args.dry_run,
-        skip_stages=set(args.skip or []),
-    )
+    if args.parallel_outline:
+        result = asyncio.run(_arun_pipeline(
+            brief=brief,
+            output_dir=args.out,
+            dry_run=args.dry_run,
+            skip_stages=set(args.skip or []),
+            parallel_outline=True,
+        ))
+    else:
+        result = run_pipeline(
+            brief=brief,
+            output_dir=args.out,
+            dry_run=args.dry_run,
+            skip_stages=set(args.skip or []),
+        )
 
     print("\nFinal output:")
     print(result)
@@ -1,18 +1,50 @@
 # app/pipeline.py
 
-import json
-import os
+import asyncio
 import re
-from typing import Any, Dict, Set
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Set, Union
+
+import msgspec
+import orjson
 
 from prompts import load_prompt
-from app.llm import call_llm
+from app.io_backend import write_files
+from app.llm import acall_llm, call_llm, call_llm_stream, env_setting
+
+
+# Expected shape of each stage's JSON reply, validated while decoding
+class Blueprint(msgspec.Struct):
+    """Stage 1 keys later stages rely on; any other blueprint keys pass through."""
+    objective: str
+    audience: str
+    primary_goal: str
+
+
+class Research(msgspec.Struct):
+    research: Union[str, Dict[str, Any]]  # prompt asks for a string; tolerate an object
+
+
+class Outline(msgspec.Struct):
+    outline: str
+
+
+class Draft(msgspec.Struct):
+    draft: str
+
 
+class QA(msgspec.Struct):
+    qa: str
 
-def safe_json(raw: str, stage: str) -> Any:
+
+def safe_json(raw: str, stage: str, schema: Any = Any) -> Any:
+    """Decode raw JSON and validate it against `schema` in one pass."""
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError as e:
+        return msgspec.json.decode(raw, type=schema)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"{stage} JSON failed validation: {e}\nReturned:\n{raw}")
+    except msgspec.DecodeError as e:
         # Show the tail of the response to help diagnose truncation
         tail = raw[-300:] if len(raw) > 300 else raw
         raise ValueError(
@@ -23,81 +55,189 @@ def safe_json(raw: str, stage: str) -> Any:
         )
 
 
+@lru_cache(maxsize=128)
+def _encode_str(value: str) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """
+    Serialize stage input deterministically: identical data always yields
+    identical bytes, so repeat runs hit OpenAI's prompt cache.
+
+    Same output as orjson.dumps(data, option=OPT_SORT_KEYS), but string
+    fields are encoded through a small cache: each stage adds one field, so
+    the blueprint, research, outline and draft text are encoded once per run
+    instead of once per later stage.
+    """
+    fields = []
+    for key in sorted(data):
+        value = data[key]
+        if isinstance(value, str):
+            encoded = _encode_str(value)
+        else:
+            encoded = orjson.dumps(value, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+        fields.append(f"{_encode_str(key)}:{encoded}")
+    return "{" + ",".join(fields) + "}"
+
+
+def _complete(
+    system: str,
+    user: str,
+    on_delta: Optional[Callable[[str], None]],
+    validate: Callable[[str], Any],
+) -> str:
+    """call_llm, or stream via call_llm_stream when the caller wants live deltas."""
+    if on_delta is None:
+        return call_llm(system, user, validate=validate)
+    chunks = []
+    for delta in call_llm_stream(system, user, validate=validate):
+        chunks.append(delta)
+        on_delta(delta)
+    return "".join(chunks)
+
+
+# Patterns used by post_process_draft, compiled once at import
+_RE_UNDERSCORE_LINK = re.compile(r'\(_{1,3}/([^)]+?)_{1,3}\)')
+_RE_HEADING = re.compile(r'^(#{2,3})\s+(.+)$', re.MULTILINE)
+_RE_PROOF_WORD = re.compile(r'\bproof\b', re.IGNORECASE)
+_RE_PROOF_CONNECTOR = re.compile(r'\bProof\b\s*[&:]\s*', re.IGNORECASE)
+_RE_TYPICALLY = re.compile(r'\b[Tt]ypically\b')
+_RE_FREE_CTA = re.compile(r'\[([^\]]*?)\bFree\s+')
+_RE_TYPICAL_HEADING = re.compile(r'^(#{2,3})\s+(.*)(\bTypical\b)(.*)', re.MULTILINE)
+_RE_NO_OBLIGATION = re.compile(r'no[- ]obligation,?\s*', re.IGNORECASE)
+_RE_WITHIN_WEEKS = re.compile(r'within weeks', re.IGNORECASE)
+_RE_DATA_ACCESS = re.compile(r'We do not access or use your data without your explicit approval')
+_RE_EVERY_ENGAGEMENT = re.compile(r'Every engagement includes (adoption|training|rollout)[^.]*\.', re.IGNORECASE)
+
+# Rules that cannot interfere with each other share one scan. The scans run
+# in the rules' original order, so the result is the same as running every
+# rule as its own pass; tests/test_post_process_draft.py checks this against
+# the original implementation. Each fused branch is built from the rule's
+# own pattern above; the leading lookahead lists the branches' first
+# characters so most positions are rejected with one set test.
+_RE_HEADING_OR_TYPICALLY = re.compile(
+    r'(?=[#Tt])'
+    rf'(?:(?P<heading>{_RE_HEADING.pattern})'
+    rf'|(?P<typically>{_RE_TYPICALLY.pattern}))',
+    re.MULTILINE,
+)
+_RE_SCOPE_CLAIMS = re.compile(
+    r'(?=[WwEe])'
+    rf'(?:(?P<within_weeks>(?i:{_RE_WITHIN_WEEKS.pattern}))'
+    rf'|(?P<data_access>{_RE_DATA_ACCESS.pattern})'
+    rf'|(?P<every_engagement>(?i:{_RE_EVERY_ENGAGEMENT.pattern})))',
+)
+
+_WITHIN_WEEKS_TEXT = 'on a timeline we confirm during kickoff'
+_DATA_ACCESS_TEXT = (
+    'We only access data you approve, and we confirm data handling expectations at the start of the engagement'
+)
+_EVERY_ENGAGEMENT_TEXT = 'Adoption resources and training guides are available when rollout support is in scope.'
+
+
+def _often(m: re.Match) -> str:
+    return "Often" if m.group(0)[0] == "T" else "often"
+
+
+def _fix_proof_heading(m: re.Match) -> str:
+    hashes = m.group(1)
+    title = m.group(2)
+    if not _RE_PROOF_WORD.search(title):
+        return m.group(0)
+    # Remove "Proof" and clean up connectors
+    cleaned = _RE_PROOF_CONNECTOR.sub('', title)
+    cleaned = _RE_PROOF_WORD.sub('', cleaned).strip()
+    if not cleaned:
+        cleaned = "How We Measure Success"
+    return f"{hashes} {cleaned}"
+
+
+def _fix_heading_or_typically(m: re.Match) -> str:
+    if m.lastgroup == "heading":
+        # The proof rule runs before "typically" → "often", as in rule order
+        return _RE_TYPICALLY.sub(_often, _RE_HEADING.sub(_fix_proof_heading, m.group(0)))
+    return _often(m)
+
+
+def _fix_typical_heading(m: re.Match) -> str:
+    return f"{m.group(1)} {m.group(2)}Example{m.group(4)}"
+
+
+def _soften_scope_claim(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind == "within_weeks":
+        return _WITHIN_WEEKS_TEXT
+    if kind == "data_access":
+        return _DATA_ACCESS_TEXT
+    return _EVERY_ENGAGEMENT_TEXT
+
+
 def post_process_draft(draft: str) -> str:
     """Fix known LLM formatting quirks that resist prompt-level correction."""
     # Strip underscore wrappers from CTA link paths:
     # (__/contact__) → (/contact)
-    draft = re.sub(r'\(_{1,3}/([^)]+?)_{1,3}\)', r'(/\1)', draft)
-
-    # Replace "Proof" in any H2/H3 heading with safe alternative
-    # Catches: "## Proof & ...", "## Proof:", "## Proof and ...", etc.
-    def fix_proof_heading(m):
-        hashes = m.group(1)
-        title = m.group(2)
-        # Remove "Proof" and clean up connectors
-        cleaned = re.sub(r'\bProof\b\s*[&:]\s*', '', title, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\bProof\b', '', cleaned, flags=re.IGNORECASE).strip()
-        if not cleaned:
-            cleaned = "How We Measure Success"
-        return f"{hashes} {cleaned}"
-    draft = re.sub(r'^(#{2,3})\s+(.+)$', lambda m: fix_proof_heading(m) if re.search(r'\bproof\b', m.group(2), re.IGNORECASE) else m.group(0), draft, flags=re.MULTILINE)
-
-    # Replace "typically" with "often" everywhere (case-insensitive)
-    draft = re.sub(r'\bTypically\b', 'Often', draft)
-    draft = re.sub(r'\btypically\b', 'often', draft)
+    draft = _RE_UNDERSCORE_LINK.sub(r'(/\1)', draft)
+
+    # Drop "Proof" from H2/H3 headings ("## Proof & ...", "## Proof:", ...),
+    # and replace "typically" with "often" everywhere, keeping the capital
+    draft = _RE_HEADING_OR_TYPICALLY.sub(_fix_heading_or_typically, draft)
 
     # Strip "Free " from CTA labels unless brief confirms free consultation
     # [Book Your Free Consultation →] → [Book Your Consultation →]
-    draft = re.sub(r'\[([^\]]*?)\bFree\s+', r'[\1', draft)
+    draft = _RE_FREE_CTA.sub(r'[\1', draft)
 
     # Replace "Typical" in headings with "Example"
-    draft = re.sub(
-        r'^(#{2,3})\s+(.*)(\bTypical\b)(.*)',
-        lambda m: f"{m.group(1)} {m.group(2)}Example{m.group(4)}",
-        draft, flags=re.MULTILINE
-    )
+    draft = _RE_TYPICAL_HEADING.sub(_fix_typical_heading, draft)
 
     # Strip "no obligation" / "no-obligation" from body text
-    draft = re.sub(r'no[- ]obligation,?\s*', '', draft, flags=re.IGNORECASE)
+    draft = _RE_NO_OBLIGATION.sub('', draft)
 
-    # Soften "within weeks" timeline promises
-    draft = re.sub(
-        r'within weeks',
-        'on a timeline we confirm during kickoff',
-        draft, flags=re.IGNORECASE
-    )
+    # Soften "within weeks", data-access and "Every engagement includes
+    # [training/adoption/rollout]" claims
+    return _RE_SCOPE_CLAIMS.sub(_soften_scope_claim, draft)
 
-    # Soften "We do not access or use your data without your explicit approval"
-    draft = re.sub(
-        r'We do not access or use your data without your explicit approval',
-        'We only access data you approve, and we confirm data handling expectations at the start of the engagement',
-        draft
-    )
-
-    # Soften "Every engagement includes [training/adoption]" scope claims
-    draft = re.sub(
-        r'Every engagement includes (adoption|training|rollout)[^.]*\.',
-        'Adoption resources and training guides are available when rollout support is in scope.',
-        draft, flags=re.IGNORECASE
-    )
 
-    return draft
+STAGE_COUNT = 6
 
 
-def env_skip(stage_num: int) -> bool:
+def _resolve_skipped_from_env() -> FrozenSet[int]:
     """
     Allows skipping stages via env vars:
     SKIP_STAGE_1=1, SKIP_STAGE_2=1, ...
+    Read once per pipeline run.
     """
-    return os.getenv(f"SKIP_STAGE_{stage_num}", "").strip() in {"1", "true", "True", "YES", "yes"}
+    return frozenset(
+        n for n in range(1, STAGE_COUNT + 1)
+        if env_setting(f"SKIP_STAGE_{n}").strip().lower() in ("1", "true", "yes")
+    )
+
+
+def should_run(stage_num: int, fn_name: str, skip_stages: Set[str], env_skipped: FrozenSet[int]) -> bool:
+    return stage_num not in env_skipped and fn_name not in skip_stages
+
 
+# Settings the brief interpreter copies verbatim from the brief, e.g.
+# `draft_mode = "publish"`. Briefs that differ in any of them can embed almost
+# identically, so they scope Stage 1's semantic cache: a blueprint is only
+# reused for a brief that states exactly the same settings.
+_RE_BRIEF_SETTING = re.compile(r'\b(draft_mode|proof_level|page_type)\s*[=:]\s*"?([\w-]*)', re.IGNORECASE)
 
-def should_run(stage_num: int, fn_name: str, skip_stages: Set[str]) -> bool:
-    if fn_name in skip_stages:
-        return False
-    if env_skip(stage_num):
-        return False
-    return True
+
+def _brief_settings(brief: str) -> str:
+    return ";".join(f"{key.lower()}={value.lower()}" for key, value in _RE_BRIEF_SETTING.findall(brief))
+
+
+def _stage_1_result(raw: str) -> Dict[str, Any]:
+    # Decoded as a plain dict so extra blueprint keys (tone, page_type, ...)
+    # are kept, then checked against the required fields
+    blueprint = safe_json(raw, "Stage 1", Dict[str, Any])
+    try:
+        msgspec.convert(blueprint, Blueprint)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"Stage 1 JSON failed validation: {e}\nReturned:\n{blueprint}")
+
+    return blueprint
 
 
 def stage_1_brief_interpreter(brief: str, dry_run: bool = False) -> Dict[str, Any]:
@@ -111,14 +251,16 @@ def stage_1_brief_interpreter(brief: str, dry_run: bool = False) -> Dict[str, An
         }
 
     system = load_prompt("brief_interpreter.system")
-    raw = call_llm(system, brief)
-    blueprint = safe_json(raw, "Stage 1")
+    raw = call_llm(system, brief, validate=_stage_1_result, semantic_scope=_brief_settings(brief))
+    return _stage_1_result(raw)
+
 
-    # Optional: assert minimum keys exist
-    for key in ("objective", "audience", "primary_goal"):
-        if key not in blueprint:
-            raise ValueError(f"Stage 1 JSON missing required key: {key}\nReturned:\n{blueprint}")
+_parse_stage_2 = partial(safe_json, stage="Stage 2", schema=Research)
 
+
+def _stage_2_result(blueprint: Dict[str, Any], raw: str) -> Dict[str, Any]:
+    research_obj = _parse_stage_2(raw)
+    blueprint["research"] = research_obj.research
     return blueprint
 
 
@@ -126,96 +268,227 @@ def stage_2_research(blueprint: Dict[str, Any], dry_run: bool = False) -> Dict[s
     print("Stage 2: Research Collector")
 
     if dry_run:
-        return {**blueprint, "research": "placeholder research"}
+        blueprint["research"] = "placeholder research"
+        return blueprint
 
     system = load_prompt("research_collector.system")
-    raw = call_llm(system, json.dumps(blueprint))
-    research_obj = safe_json(raw, "Stage 2")
+    raw = call_llm(system, _dumps(blueprint), validate=_parse_stage_2)
+    return _stage_2_result(blueprint, raw)
+
 
-    # Expecting {"research": "..."} or {"research": {...}}
-    if "research" not in research_obj:
-        raise ValueError(f"Stage 2 JSON missing 'research' key.\nReturned:\n{research_obj}")
+_parse_stage_3 = partial(safe_json, stage="Stage 3", schema=Outline)
 
-    return {**blueprint, "research": research_obj["research"]}
+
+def _stage_3_result(data: Dict[str, Any], raw: str) -> Dict[str, Any]:
+    outline_obj = _parse_stage_3(raw)
+    data["outline"] = outline_obj.outline
+    return data
 
 
 def stage_3_outline(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
     print("Stage 3: Outline Architect")
 
     if dry_run:
-        return {**data, "outline": "placeholder outline"}
+        data["outline"] = "placeholder outline"
+        return data
 
     system = load_prompt("outline_architect.system")
-    raw = call_llm(system, json.dumps(data))
-    outline_obj = safe_json(raw, "Stage 3")
+    raw = call_llm(system, _dumps(data), validate=_parse_stage_3)
+    return _stage_3_result(data, raw)
+
 
-    if "outline" not in outline_obj:
-        raise ValueError(f"Stage 3 JSON missing 'outline' key.\nReturned:\n{outline_obj}")
+_parse_stage_4 = partial(safe_json, stage="Stage 4", schema=Draft)
 
-    return {**data, "outline": outline_obj["outline"]}
+
+def _stage_4_result(data: Dict[str, Any], raw: str) -> Dict[str, Any]:
+    draft_obj = _parse_stage_4(raw)
+    data["draft"] = post_process_draft(draft_obj.draft)
+    return data
 
 
-def stage_4_draft(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+def stage_4_draft(
+    data: Dict[str, Any],
+    dry_run: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     print("Stage 4: Draft Writer")
 
     if dry_run:
-        return {**data, "draft": "placeholder draft"}
+        data["draft"] = "placeholder draft"
+        return data
 
     system = load_prompt("draft_writer.system")
-    raw = call_llm(system, json.dumps(data))
-    draft_obj = safe_json(raw, "Stage 4")
+    raw = _complete(system, _dumps(data), on_delta, _parse_stage_4)
+    return _stage_4_result(data, raw)
+
+
+# The voice harmonizer polishes the finished draft against the blueprint and
+# research; the outline the draft was written from is dead weight in its prompt.
+_STAGE_5_OMITTED_FIELDS = frozenset({"outline"})
+
 
-    if "draft" not in draft_obj:
-        raise ValueError(f"Stage 4 JSON missing 'draft' key.\nReturned:\n{draft_obj}")
+def _stage_5_input(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if k not in _STAGE_5_OMITTED_FIELDS}
 
-    return {**data, "draft": post_process_draft(draft_obj["draft"])}
 
+_parse_stage_5 = partial(safe_json, stage="Stage 5", schema=Draft)
 
-def stage_5_voice_harmonizer(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+
+def _stage_5_result(data: Dict[str, Any], raw: str) -> Dict[str, Any]:
+    harmonized_obj = _parse_stage_5(raw)
+    data["draft"] = post_process_draft(harmonized_obj.draft)
+    return data
+
+
+def stage_5_voice_harmonizer(
+    data: Dict[str, Any],
+    dry_run: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     print("Stage 5: Voice Harmonizer")
 
     if dry_run:
         return data  # draft stays as-is in dry run
 
     system = load_prompt("voice_harmonizer.system")
-    raw = call_llm(system, json.dumps(data))
-    harmonized_obj = safe_json(raw, "Stage 5")
+    raw = _complete(system, _dumps(_stage_5_input(data)), on_delta, _parse_stage_5)
+    return _stage_5_result(data, raw)
+
 
-    if "draft" not in harmonized_obj:
-        raise ValueError(f"Stage 5 JSON missing 'draft' key.\nReturned:\n{harmonized_obj}")
+_parse_stage_6 = partial(safe_json, stage="Stage 6", schema=QA)
 
-    return {**data, "draft": post_process_draft(harmonized_obj["draft"])}
+
+def _stage_6_result(data: Dict[str, Any], raw: str) -> Dict[str, Any]:
+    qa_obj = _parse_stage_6(raw)
+    data["qa"] = qa_obj.qa
+    return data
 
 
-def stage_6_qa(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+def stage_6_qa(
+    data: Dict[str, Any],
+    dry_run: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     print("Stage 6: QA Reviewer")
 
     if dry_run:
-        return {**data, "qa": "passed"}
+        data["qa"] = "passed"
+        return data
 
     system = load_prompt("qa_reviewer.system")
-    raw = call_llm(system, json.dumps(data))
-    qa_obj = safe_json(raw, "Stage 6")
+    raw = _complete(system, _dumps(data), on_delta, _parse_stage_6)
+    return _stage_6_result(data, raw)
 
-    if "qa" not in qa_obj:
-        raise ValueError(f"Stage 6 JSON missing 'qa' key.\nReturned:\n{qa_obj}")
 
-    return {**data, "qa": qa_obj["qa"]}
+# ---------------------------------------------------------------------------
+# Async stage variants — same prompts and validation, awaiting acall_llm.
+# Dry runs never touch the network, so they reuse the sync stage as-is.
+# ---------------------------------------------------------------------------
 
+async def astage_1_brief_interpreter(brief: str, dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_1_brief_interpreter(brief, dry_run=True)
 
-def write_draft_md(data: Dict[str, Any], output_dir: str) -> str:
-    """Save just the draft as a clean, readable Markdown file."""
-    draft_path = os.path.join(output_dir, "draft.md")
-    draft = data.get("draft", "")
-    with open(draft_path, "w", encoding="utf-8") as f:
-        f.write(draft)
-    print(f"Wrote draft:   {draft_path}")
-    return draft_path
+    print("Stage 1: Brief Interpreter (AI)")
+    system = load_prompt("brief_interpreter.system")
+    raw = await acall_llm(system, brief, validate=_stage_1_result, semantic_scope=_brief_settings(brief))
+    return _stage_1_result(raw)
 
 
-def write_summary_md(data: Dict[str, Any], output_dir: str) -> str:
-    """Save a full summary with metadata + the draft content."""
-    summary_path = os.path.join(output_dir, "summary.md")
+async def astage_2_research(blueprint: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_2_research(blueprint, dry_run=True)
+
+    print("Stage 2: Research Collector")
+    system = load_prompt("research_collector.system")
+    raw = await acall_llm(system, _dumps(blueprint), validate=_parse_stage_2)
+    return _stage_2_result(blueprint, raw)
+
+
+async def astage_3_outline(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_3_outline(data, dry_run=True)
+
+    print("Stage 3: Outline Architect")
+    system = load_prompt("outline_architect.system")
+    raw = await acall_llm(system, _dumps(data), validate=_parse_stage_3)
+    return _stage_3_result(data, raw)
+
+
+async def astage_3a_outline_from_blueprint(blueprint: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Outline built from the blueprint alone, so it can run alongside Stage 2.
+    Returns just {"outline": ...} for the caller to merge. Research [VERIFY]
+    flags won't be reflected in this outline; the draft writer still
+    receives the research pack.
+    """
+    print("Stage 3: Outline Architect (from blueprint)")
+
+    if dry_run:
+        return {"outline": "placeholder outline"}
+
+    system = load_prompt("outline_architect.system")
+    raw = await acall_llm(system, _dumps(blueprint), validate=_parse_stage_3)
+    # Returned on its own, not merged: Stage 2 is updating the blueprint meanwhile
+    return _stage_3_result({}, raw)
+
+
+async def astage_4_draft(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_4_draft(data, dry_run=True)
+
+    print("Stage 4: Draft Writer")
+    system = load_prompt("draft_writer.system")
+    raw = await acall_llm(system, _dumps(data), validate=_parse_stage_4)
+    return _stage_4_result(data, raw)
+
+
+async def astage_5_voice_harmonizer(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_5_voice_harmonizer(data, dry_run=True)
+
+    print("Stage 5: Voice Harmonizer")
+    system = load_prompt("voice_harmonizer.system")
+    raw = await acall_llm(system, _dumps(_stage_5_input(data)), validate=_parse_stage_5)
+    return _stage_5_result(data, raw)
+
+
+async def astage_6_qa(data: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    if dry_run:
+        return stage_6_qa(data, dry_run=True)
+
+    print("Stage 6: QA Reviewer")
+    system = load_prompt("qa_reviewer.system")
+    raw = await acall_llm(system, _dumps(data), validate=_parse_stage_6)
+    return _stage_6_result(data, raw)
+
+
+def iter_json(data: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Same layout as json.dump(data, f, indent=2, ensure_ascii=False), but each
+    top-level field is encoded (with orjson) and yielded on its own. Written
+    as a stream (threaded backend), only the largest field (usually the
+    draft) is held encoded at once; the io_uring backend keeps every chunk
+    until the write completes, i.e. one copy of the file, never a joined one.
+    """
+    if not data:
+        yield b"{}"
+        return
+
+    yield b"{\n"
+    last = len(data) - 1
+    for i, (key, value) in enumerate(data.items()):
+        # Newlines inside strings are escaped, so every b"\n" here is layout
+        encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+        # Yielded separately, not concatenated, so the value isn't copied again
+        yield b"  " + orjson.dumps(key) + b": "
+        yield encoded
+        yield b",\n" if i < last else b"\n"
+    yield b"}"
+
+
+def render_summary_md(data: Dict[str, Any]) -> str:
+    """Full summary with metadata + the draft content, as Markdown."""
     sections = []
 
     sections.append("# Pipeline Summary\n")
@@ -247,26 +520,45 @@ def write_summary_md(data: Dict[str, Any], output_dir: str) -> str:
         sections.append("## QA Review\n")
         sections.append(f"{data['qa']}\n")
 
-    with open(summary_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(sections))
+    return "\n".join(sections)
+
+
+def write_draft_md(data: Dict[str, Any], output_dir: str | Path) -> str:
+    """Save just the draft as a clean, readable Markdown file."""
+    draft_path = Path(output_dir) / "draft.md"
+    write_files([(draft_path, [data.get("draft", "").encode("utf-8")])])
+    print(f"Wrote draft:   {draft_path}")
+    return str(draft_path)
+
+
+def write_summary_md(data: Dict[str, Any], output_dir: str | Path) -> str:
+    """Save a full summary with metadata + the draft content."""
+    summary_path = Path(output_dir) / "summary.md"
+    write_files([(summary_path, [render_summary_md(data).encode("utf-8")])])
     print(f"Wrote summary: {summary_path}")
-    return summary_path
+    return str(summary_path)
 
 
-def write_output(data: Dict[str, Any], output_dir: str) -> str:
-    os.makedirs(output_dir, exist_ok=True)
+def write_output(data: Dict[str, Any], output_dir: str | Path) -> str:
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Raw JSON (full pipeline data)
-    out_path = os.path.join(output_dir, "result.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"\nWrote JSON:    {out_path}")
+    # Raw JSON (full pipeline data) plus the human-readable files, handed to
+    # the I/O backend as one batch (io_uring on Linux, else threaded writes)
+    json_path = out_dir / "result.json"
+    draft_path = out_dir / "draft.md"
+    summary_path = out_dir / "summary.md"
+    write_files([
+        (json_path, iter_json(data)),
+        (draft_path, [data.get("draft", "").encode("utf-8")]),
+        (summary_path, [render_summary_md(data).encode("utf-8")]),
+    ])
 
-    # Human-readable files
-    write_draft_md(data, output_dir)
-    write_summary_md(data, output_dir)
+    print(f"\nWrote JSON:    {json_path}")
+    print(f"Wrote draft:   {draft_path}")
+    print(f"Wrote summary: {summary_path}")
 
-    return out_path
+    return str(json_path)
 
 
 def run_pipeline(
@@ -280,37 +572,38 @@ def run_pipeline(
     """
     if skip_stages is None:
         skip_stages = set()
+    env_skipped = _resolve_skipped_from_env()
 
     print("\nRunning AI Content Pipeline\n")
 
     data: Dict[str, Any] = {}
 
-    if should_run(1, "stage_1_brief_interpreter", skip_stages):
+    if should_run(1, "stage_1_brief_interpreter", skip_stages, env_skipped):
         data = stage_1_brief_interpreter(brief, dry_run=dry_run)
     else:
         print("Skipping Stage 1")
 
-    if should_run(2, "stage_2_research", skip_stages):
+    if should_run(2, "stage_2_research", skip_stages, env_skipped):
         data = stage_2_research(data, dry_run=dry_run)
     else:
         print("Skipping Stage 2")
 
-    if should_run(3, "stage_3_outline", skip_stages):
+    if should_run(3, "stage_3_outline", skip_stages, env_skipped):
         data = stage_3_outline(data, dry_run=dry_run)
     else:
         print("Skipping Stage 3")
 
-    if should_run(4, "stage_4_draft", skip_stages):
+    if should_run(4, "stage_4_draft", skip_stages, env_skipped):
         data = stage_4_draft(data, dry_run=dry_run)
     else:
         print("Skipping Stage 4")
 
-    if should_run(5, "stage_5_voice_harmonizer", skip_stages):
+    if should_run(5, "stage_5_voice_harmonizer", skip_stages, env_skipped):
         data = stage_5_voice_harmonizer(data, dry_run=dry_run)
     else:
         print("Skipping Stage 5")
 
-    if should_run(6, "stage_6_qa", skip_stages):
+    if should_run(6, "stage_6_qa", skip_stages, env_skipped):
         data = stage_6_qa(data, dry_run=dry_run)
     else:
         print("Skipping Stage 6")
@@ -319,3 +612,78 @@ def run_pipeline(
 
     print("\nPipeline complete\n")
     return data
+
+
+async def arun_pipeline(
+    brief: str,
+    output_dir: str | Path = "data/output",
+    dry_run: bool = False,
+    skip_stages: Set[str] | None = None,
+    parallel_outline: bool = False,
+) -> Dict[str, Any]:
+    """
+    Async twin of run_pipeline. Stages still run in order for a single brief;
+    the win comes from awaiting many briefs at once (see app.batch.run_batch).
+
+    parallel_outline: run Stage 2 and a blueprint-only Stage 3 concurrently
+    (see astage_3a_outline_from_blueprint) instead of outlining from research.
+
+    The LLM client is shared by every pipeline on the loop, so this doesn't
+    close it: whoever runs the loop awaits app.llm.aclose_llm() at the end.
+    """
+    if skip_stages is None:
+        skip_stages = set()
+    env_skipped = _resolve_skipped_from_env()
+
+    print("\nRunning AI Content Pipeline (async)\n")
+
+    data: Dict[str, Any] = {}
+
+    if should_run(1, "stage_1_brief_interpreter", skip_stages, env_skipped):
+        data = await astage_1_brief_interpreter(brief, dry_run=dry_run)
+    else:
+        print("Skipping Stage 1")
+
+    run_research = should_run(2, "stage_2_research", skip_stages, env_skipped)
+    run_outline = should_run(3, "stage_3_outline", skip_stages, env_skipped)
+
+    if parallel_outline and run_research and run_outline:
+        # Stage 2 adds "research" to `data` in place, possibly before 3a has
+        # serialized its input (e.g. on a cache hit), so 3a gets its own copy
+        research_data, outline_data = await asyncio.gather(
+            astage_2_research(data, dry_run=dry_run),
+            astage_3a_outline_from_blueprint(dict(data), dry_run=dry_run),
+        )
+        data = research_data
+        data["outline"] = outline_data["outline"]
+    else:
+        if run_research:
+            data = await astage_2_research(data, dry_run=dry_run)
+        else:
+            print("Skipping Stage 2")
+
+        if run_outline:
+            data = await astage_3_outline(data, dry_run=dry_run)
+        else:
+            print("Skipping Stage 3")
+
+    if should_run(4, "stage_4_draft", skip_stages, env_skipped):
+        data = await astage_4_draft(data, dry_run=dry_run)
+    else:
+        print("Skipping Stage 4")
+
+    if should_run(5, "stage_5_voice_harmonizer", skip_stages, env_skipped):
+        data = await astage_5_voice_harmonizer(data, dry_run=dry_run)
+    else:
+        print("Skipping Stage 5")
+
+    if should_run(6, "stage_6_qa", skip_stages, env_skipped):
+        data = await astage_6_qa(data, dry_run=dry_run)
+    else:
+        print("Skipping Stage 6")
+
+    await asyncio.to_thread(write_output, data, output_dir)
+
+    print("\nPipeline complete\n")
+    return data
+
@@ -1,10 +1,24 @@
+from functools import lru_cache
 from pathlib import Path
 
 PROMPTS_DIR = Path(__file__).parent  # the /prompts folder
 
+# System prompts used by the pipeline stages, in stage order
+PROMPT_NAMES = (
+    "brief_interpreter.system",
+    "research_collector.system",
+    "outline_architect.system",
+    "draft_writer.system",
+    "voice_harmonizer.system",
+    "qa_reviewer.system",
+)
+
+
+@lru_cache(maxsize=32)
 def load_prompt(name: str) -> str:
     """
     Loads a prompt file from the prompts directory.
+    Each file is read once per process; later calls return the cached text.
 
     Example:
       load_prompt("brief_interpreter.system") -> reads prompts/brief_interpreter.system
@@ -13,3 +27,8 @@ def load_prompt(name: str) -> str:
     if not path.exists():
         raise FileNotFoundError(f"Prompt not found: {path}")
     return path.read_text(encoding="utf-8")
+
+
+# Warm the cache at import so a missing prompt fails here, not mid-pipeline
+for _name in PROMPT_NAMES:
+    load_prompt(_name)
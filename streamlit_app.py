@@ -4,7 +4,7 @@ Run with:  streamlit run streamlit_app.py
 """
 
 import json
-import os
+import re
 import sys
 import time
 from pathlib import Path
@@ -110,11 +110,58 @@ STAGE_FNS = {
     1: lambda data, dr: stage_1_brief_interpreter(data, dry_run=dr),
     2: lambda data, dr: stage_2_research(data, dry_run=dr),
     3: lambda data, dr: stage_3_outline(data, dry_run=dr),
-    4: lambda data, dr: stage_4_draft(data, dry_run=dr),
-    5: lambda data, dr: stage_5_voice_harmonizer(data, dry_run=dr),
-    6: lambda data, dr: stage_6_qa(data, dry_run=dr),
+    4: lambda data, dr, on_delta=None: stage_4_draft(data, dry_run=dr, on_delta=on_delta),
+    5: lambda data, dr, on_delta=None: stage_5_voice_harmonizer(data, dry_run=dr, on_delta=on_delta),
+    6: lambda data, dr, on_delta=None: stage_6_qa(data, dry_run=dr, on_delta=on_delta),
 }
 
+# Long-output stages whose response is streamed into the page as it arrives
+STREAMED_STAGES = {4, 5, 6}
+
+# Each re-render sends the whole text so far to the browser, so the live
+# preview is refreshed at most this often rather than on every token
+LIVE_REFRESH_SECONDS = 0.1
+
+# Streamed stages reply with one string field, e.g. {"draft": "..."}
+_RE_REPLY_START = re.compile(r'\s*\{\s*"[^"]*"\s*:\s*"')
+# The string body up to its closing quote, stopping before an escape that
+# hasn't fully arrived yet (a lone "\" or a partial "\uXXXX")
+_RE_STRING_BODY = re.compile(r'(?:[^"\\]|\\u[0-9a-fA-F]{4}|\\[^u])*')
+
+
+def partial_reply_text(raw: str) -> str:
+    """Decoded text of the string value in a partial single-field JSON reply."""
+    start = _RE_REPLY_START.match(raw)
+    if start is None:
+        return ""
+    body = _RE_STRING_BODY.match(raw, start.end()).group()
+    try:
+        text = json.loads(f'"{body}"', strict=False)
+    except ValueError:
+        return ""
+    # Drop a high surrogate whose pair is still on its way
+    if text and "\ud800" <= text[-1] <= "\udbff":
+        text = text[:-1]
+    return text
+
+
+class LivePreview:
+    """on_delta callback that renders the streamed reply as Markdown, throttled."""
+
+    def __init__(self, box):
+        self.box = box
+        self.chunks = []
+        self.last_render = 0.0
+
+    def __call__(self, delta: str) -> None:
+        self.chunks.append(delta)
+        if time.monotonic() - self.last_render >= LIVE_REFRESH_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last_render = time.monotonic()
+        self.box.markdown(partial_reply_text("".join(self.chunks)))
+
 if run_button:
     if not brief_text.strip():
         st.error("Please provide a brief before running the pipeline.")
@@ -123,6 +170,7 @@ if run_button:
     # Progress bar + status
     progress = st.progress(0, text="Starting pipeline...")
     status_box = st.empty()
+    live_box = st.empty()
 
     data = {}
     total = len(STAGES)
@@ -134,7 +182,6 @@ if run_button:
 
         if skip:
             status_box.info(f"Skipping Stage {num}: {label}")
-            time.sleep(0.3)
             continue
 
         status_box.info(f"Running Stage {num}: {label}...")
@@ -142,6 +189,10 @@ if run_button:
         try:
             if num == 1:
                 data = STAGE_FNS[num](brief_text, dry_run)
+            elif num in STREAMED_STAGES and not dry_run:
+                preview = LivePreview(live_box)
+                data = STAGE_FNS[num](data, dry_run, on_delta=preview)
+                preview.flush()  # show the complete reply until the next stage starts
             else:
                 data = STAGE_FNS[num](data, dry_run)
         except Exception as e:
@@ -149,6 +200,7 @@ if run_button:
             st.error(f"Stage {num} ({label}) failed:\n\n```\n{e}\n```")
             st.stop()
 
+    live_box.empty()
     elapsed = time.time() - t0
     progress.progress(100, text="Pipeline complete!")
     status_box.success(f"Done in {elapsed:.1f}s")